@@ -1,31 +1,141 @@
 import json
-import matplotlib.pyplot as plt
+import prebuild
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 import streamlit as st
 from urllib.request import urlopen
 
+# Year filter choices, built once at import
+YEAR_OPTIONS = ("all", *range(2001, 2022))
 
-@st.cache
-def load_data(type=None):
-    # Specify location
-    if type == "choropleth":
-        source_file = "choropleth.csv"
-    elif type == "hourly":
-        source_file = "hourly.csv"
-    else:
-        source_file = "day_of_week.csv"
+# Static markdown blocks, allocated once at import instead of per rerun
+_INTRO_MD = """
+        In this web app, we aim to answer the following questions: 
+        
+        1. Where and when do fatal collisions occur? 
+        2. Using the data, can we predict the conditions which would result to injurious collisions? 
+        3. How do we mitigate these collisions?
+        """
+
+_FINDINGS_MD = """
+        In exploring the data, we have found that: 
+        
+        1. Los Angeles registers the most number of fatal collisions from 2001 to 2021.
+        2. In terms of day of week, most fatal collisions usually occur during Saturdays.
+        3. In terms of hour, most fatal collisions usually occur at 6 PM. 
+        """
+
+_RECOMMENDATIONS_MD = """
+        California should monitor closely the insights extracted fromt their data. 
+        Stringent traffic measures must be implemented along Los Angeles and patrol groups should be able
+        to monitor roads during the evenings and the weekends. 
+        
+        To further improve the modelling, we can consider other variables that could potentially affect 
+        the severity of collisions. This will also help us in simulating environments that could be harmful to
+        motorists. These simulations, in effect, can inform the decisions of policymakers and patrol groups 
+        in creating an environment that is safe for motorists. 
+        """
+
+_AUTHOR_MD = """
+        This web app was created by **Rick Aaron Sta.Clara**. He is a data scientist with a degree in chemical engineering.
+        He is currently improving his capacities in understanding data and algorithms. Visit his profile here: 
+        linkedin.com/in/rick-aaron-sta-clara-7470b1114.
+        """
 
-    # Load the data
-    collisions = pd.read_csv(
-        source_file
-    )
 
-    # Edit choropleth file
-    if type == "choropleth":
-        collisions["FIPS"] = "0" + collisions["FIPS"].astype(str)
+@st.cache_data(show_spinner=False)
+def _load_choropleth():
+    # Load the data (the Parquet copy is built from choropleth.csv on first use)
+    collisions = pd.read_parquet(prebuild.ensure_parquet("choropleth"))
 
-    return collisions
+    # Restore the leading zero of the California FIPS codes (one pass, width-safe)
+    collisions["FIPS"] = collisions["FIPS"].map("{:05d}".format).astype("string")
+
+    # Pre-slice by year so each rerun is an O(1) dict lookup; the slices keep
+    # only the columns the plots read
+    by_year = {
+        year: group.drop(columns="year_option").reset_index(drop=True)
+        for year, group in collisions.groupby("year_option")
+    }
+
+    return by_year
+
+
+@st.cache_data(show_spinner=False)
+def _load_hourly():
+    # Load the data (the Parquet copy is built from hourly.csv on first use)
+    collisions = pd.read_parquet(prebuild.ensure_parquet("hourly"))
+
+    # Collapse to one row per (year, hour); guards against raw rows sneaking in
+    collisions = collisions.groupby(["year_option", "collision_hour"], sort=False, as_index=False)["killed_victims"].sum()
+
+    # Pre-slice by year so each rerun is an O(1) dict lookup; the slices keep
+    # only the columns the plots read
+    by_year = {
+        year: group.drop(columns="year_option").reset_index(drop=True)
+        for year, group in collisions.groupby("year_option")
+    }
+
+    return by_year
+
+
+@st.cache_data(show_spinner=False)
+def _load_dow():
+    # Load the data (the Parquet copy is built from day_of_week.csv on first use)
+    collisions = pd.read_parquet(prebuild.ensure_parquet("day_of_week"))
+
+    # Collapse to one row per (year, day); sort=False keeps the Mon-Sun file order
+    collisions = collisions.groupby(["year_option", "collision_day"], sort=False, as_index=False)["killed_victims"].sum()
+
+    # Pre-slice by year so each rerun is an O(1) dict lookup; the slices keep
+    # only the columns the plots read
+    by_year = {
+        year: group.drop(columns="year_option").reset_index(drop=True)
+        for year, group in collisions.groupby("year_option")
+    }
+
+    return by_year
+
+
+def _round_coords(coords):
+    # Quantize nested coordinate lists to 4 decimals (roughly 11 m on the ground)
+    if isinstance(coords[0], list):
+        return [_round_coords(part) for part in coords]
+    return [round(value, 4) for value in coords]
+
+
+@st.cache_resource(show_spinner=False)
+def _load_counties_geojson():
+    # Fetch and parse the US counties geojson once per process
+    with urlopen("https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json") as response:
+        counties = json.load(response)
+
+    # Keep only the ~58 California counties out of the ~3200 US features
+    counties["features"] = [feature for feature in counties["features"] if feature["properties"]["STATE"] == "06"]
+
+    # Drop the excess float precision; it only bloats what Plotly ships to the browser
+    for feature in counties["features"]:
+        feature["geometry"]["coordinates"] = _round_coords(feature["geometry"]["coordinates"])
+
+    return counties
+
+
+@st.cache_data(show_spinner=False)
+def _photo_bytes():
+    # Read the cover photo once per process
+    with open("collision_photo.jpg", "rb") as photo:
+        return photo.read()
+
+
+@st.cache_data(show_spinner=False)
+def _slide_bytes():
+    # Read the methodology slides once per process
+    slides = []
+    for number in range(1, 6):
+        with open("Slide{}.PNG".format(number), "rb") as slide:
+            slides.append(slide.read())
+    return slides
 
 
 def introduction():
@@ -37,51 +147,54 @@ def introduction():
     )
 
     # Write details of the web app
-    st.markdown(
-        """
-        In this web app, we aim to answer the following questions: 
-        
-        1. Where and when do fatal collisions occur? 
-        2. Using the data, can we predict the conditions which would result to injurious collisions? 
-        3. How do we mitigate these collisions?
-        """
-    )
+    st.markdown(_INTRO_MD)
 
     # Add image
-    st.image("collision_photo.jpg")
+    st.image(_photo_bytes())
     st.caption(
-        f"Source: Forbes (https://www.forbes.com/sites/carltonreid/2020/09/28/journalists-should-stress-agency-in-reporting-on-traffic-crashes-states-new-media-guidelines).")
-
+        "Source: Forbes (https://www.forbes.com/sites/carltonreid/2020/09/28/journalists-should-stress-agency-in-reporting-on-traffic-crashes-states-new-media-guidelines).")
 
-def generate_choropleth_map(year):
-    # Load the data
-    collisions = load_data(type="choropleth")
 
-    # Apply filter
-    collisions = collisions[collisions["year_option"] == str(year)]
+@st.cache_resource(show_spinner=False)
+def _choropleth_skeleton():
+    # Build the figure scaffold (trace, layout, geojson) once per process
+    collisions = _load_choropleth()["all"]
 
-    # Generate the choropleth map
-    with urlopen("https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json") as response:
-        counties = json.load(response)
-
-    fig = px.choropleth(
+    fig = px.choropleth_map(
         collisions,
-        geojson=counties,
+        geojson=_load_counties_geojson(),
         locations="FIPS",
         color="killed_victims",
         color_continuous_scale="YlOrRd",
-        scope="usa",
+        map_style="carto-positron",
+        zoom=5,
+        center={"lat": 37.3, "lon": -120},
         hover_data=["county", "FIPS", "killed_victims"],
         labels={
             'county': "county",
             'killed_victims': 'fatalities'
         },
     )
-    fig.update_geos(fitbounds="locations", visible=False)
     fig.update_layout(
         margin={"r": 0, "t": 0, "l": 0, "b": 0},
     )
 
+    return fig
+
+
+def generate_choropleth_map(year):
+    # Load the data
+    collisions = _load_choropleth()[str(year)]
+
+    # Patch a copy of the cached scaffold with this year's data; the skeleton
+    # itself is shared across sessions and must never be mutated
+    fig = go.Figure(_choropleth_skeleton())
+    fig.update_traces(
+        locations=collisions["FIPS"],
+        z=collisions["killed_victims"],
+        customdata=collisions[["county", "FIPS", "killed_victims"]].to_numpy(),
+    )
+
     # Show the choropleth map
     st.markdown("**Number of collision fatalities for each county in California**")
     st.plotly_chart(fig)
@@ -89,44 +202,40 @@ def generate_choropleth_map(year):
 
 def generate_collisions_by_hour_bar_graph(year):
     # Load the data
-    collisions = load_data(type="hourly")
+    collisions = _load_hourly()[str(year)]
 
-    # Apply filter
-    collisions = collisions[collisions["year_option"] == str(year)]
-
-    # Plot the data
-    fig, ax = plt.subplots(figsize=(6, 3), dpi=200)
-    ax.bar(
-        collisions["collision_hour"],
-        collisions["killed_victims"],
-    )
-    ax.set_ylabel("Number of killed victims")
-    ax.set_xlabel("Hour")
+    # Plot the small frame with Plotly; uirevision lets the client patch the
+    # existing trace instead of rebuilding its canvas on every year change
     st.markdown(
         "**Number of fatalities per hour due to collisions**"
     )
-    st.pyplot(fig)
+    fig = px.bar(
+        collisions,
+        x="collision_hour",
+        y="killed_victims",
+        labels={"collision_hour": "Hour", "killed_victims": "Number of killed victims"},
+    )
+    fig.update_layout(uirevision="hour_bar")
+    st.plotly_chart(fig, width="stretch")
 
 
 def generate_collisions_by_day_of_week_bar_graph(year):
     # Load the data
-    collisions = load_data(type="day_of_week")
-
-    # Apply filter
-    collisions = collisions[collisions["year_option"] == str(year)]
+    collisions = _load_dow()[str(year)]
 
-    # Plot the data
-    fig, ax = plt.subplots(figsize=(6, 3), dpi=200)
-    ax.bar(
-        collisions["collision_day"],
-        collisions["killed_victims"],
-    )
-    ax.set_ylabel("Number of killed victims")
-    ax.set_xlabel("Day of week")
+    # Plot the small frame with Plotly; uirevision lets the client patch the
+    # existing trace instead of rebuilding its canvas on every year change
     st.markdown(
         "**Number of fatalities per day of week due to collisions**"
     )
-    st.pyplot(fig)
+    fig = px.bar(
+        collisions,
+        x="collision_day",
+        y="killed_victims",
+        labels={"collision_day": "Day of week", "killed_victims": "Number of killed victims"},
+    )
+    fig.update_layout(uirevision="day_of_week_bar")
+    st.plotly_chart(fig, width="stretch")
 
 
 def descriptive_analytics():
@@ -136,16 +245,10 @@ def descriptive_analytics():
         "This section aims to provide insights regarding the geographical and temporal aspect of fatal collisions in California."
     )
 
-    # Generate year_options
-    year_options = ["all"]
-    year_list = range(2001, 2022)
-    for year in year_list:
-        year_options.append(year)
-
     # Ask for user input
     year = st.selectbox(
         "Select year",
-        year_options
+        YEAR_OPTIONS
     )
 
     # Generate choropleth map
@@ -167,24 +270,24 @@ def predictive_analytics():
     st.write(
         "Using the California Traffic Collisions Data, a model was built using the following methodology. "
     )
-    st.image("Slide1.PNG")
+    st.image(_slide_bytes()[0])
     st.caption("Access the files at https://github.com/aaronstaclara/california-traffic-collisions-dataset.")
 
     # Outline features
     st.write("The following features were used in the modelling: ")
-    st.image("Slide2.PNG")
+    st.image(_slide_bytes()[1])
 
     # Outline model
     st.write("The model works as follows. Models used were Linear Regression and Gradient Boosting Regressor: ")
-    st.image("Slide3.PNG")
+    st.image(_slide_bytes()[2])
 
     # Outline results
     st.write("The results of the modelling are as follows: ")
-    st.image("Slide4.PNG")
+    st.image(_slide_bytes()[3])
 
     # Outline feature importance
     st.write("In the modelling, party_count, type_of_collision_sideswipe and distance were found to significantly affect the prediction: ")
-    st.image("Slide5.PNG")
+    st.image(_slide_bytes()[4])
 
 
 def conclusion():
@@ -193,65 +296,27 @@ def conclusion():
 
     # Outline conclusions and recommendations
     st.subheader("What We Found")
-    st.markdown(
-        """
-        In exploring the data, we have found that: 
-        
-        1. Los Angeles registers the most number of fatal collisions from 2001 to 2021.
-        2. In terms of day of week, most fatal collisions usually occur during Saturdays.
-        3. In terms of hour, most fatal collisions usually occur at 6 PM. 
-        """
-    )
+    st.markdown(_FINDINGS_MD)
 
     # Outline conclusions and recommendations
     st.subheader("What We Can Do")
-    st.markdown(
-        """
-        California should monitor closely the insights extracted fromt their data. 
-        Stringent traffic measures must be implemented along Los Angeles and patrol groups should be able
-        to monitor roads during the evenings and the weekends. 
-        
-        To further improve the modelling, we can consider other variables that could potentially affect 
-        the severity of collisions. This will also help us in simulating environments that could be harmful to
-        motorists. These simulations, in effect, can inform the decisions of policymakers and patrol groups 
-        in creating an environment that is safe for motorists. 
-        """
-    )
+    st.markdown(_RECOMMENDATIONS_MD)
 
 def author():
     # Detail info about the author
     st.title("🚗 Author")
 
-    st.markdown(
-        """
-        This web app was created by **Rick Aaron Sta.Clara**. He is a data scientist with a degree in chemical engineering.
-        He is currently improving his capacities in understanding data and algorithms. Visit his profile here: 
-        linkedin.com/in/rick-aaron-sta-clara-7470b1114.
-        """
-    )
+    st.markdown(_AUTHOR_MD)
 
-list_of_pages = [
-    "The Data",
-    "Analyzing Fatal Collisions",
-    "Predicting Injured Victims",
-    "Conclusions and Recommendations",
-    "Author"
-]
+PAGES = {
+    "The Data": introduction,
+    "Analyzing Fatal Collisions": descriptive_analytics,
+    "Predicting Injured Victims": predictive_analytics,
+    "Conclusions and Recommendations": conclusion,
+    "Author": author,
+}
 
 st.sidebar.title(':scroll: Main Pages')
-selection = st.sidebar.radio("Go to: ", list_of_pages)
-
-if selection == "The Data":
-    introduction()
-
-elif selection == "Analyzing Fatal Collisions":
-    descriptive_analytics()
-
-elif selection == "Predicting Injured Victims":
-    predictive_analytics()
-
-elif selection == "Conclusions and Recommendations":
-    conclusion()
+selection = st.sidebar.radio("Go to: ", list(PAGES))
 
-elif selection == "Author":
-    author()
\ No newline at end of file
+PAGES[selection]()
\ No newline at end of file
@@ -0,0 +1,40 @@
+import os
+
+import pandas as pd
+
+# Columns and dtypes that app.py actually uses, keyed by file stem
+SCHEMAS = {
+    "choropleth": {
+        "usecols": ["FIPS", "county", "killed_victims", "year_option"],
+        "dtype": {"FIPS": "int32", "county": "string", "killed_victims": "float32", "year_option": "category"},
+    },
+    "hourly": {
+        "usecols": ["collision_hour", "killed_victims", "year_option"],
+        "dtype": {"collision_hour": "int8", "killed_victims": "float32", "year_option": "category"},
+    },
+    "day_of_week": {
+        "usecols": ["collision_day", "killed_victims", "year_option"],
+        "dtype": {"collision_day": "string", "killed_victims": "float32", "year_option": "category"},
+    },
+}
+
+
+def build_parquet(stem):
+    # Parse the CSV once with the tight schema and persist it as Parquet
+    schema = SCHEMAS[stem]
+    collisions = pd.read_csv(stem + ".csv", usecols=schema["usecols"], dtype=schema["dtype"])
+    collisions.to_parquet(stem + ".parquet", compression="zstd")
+    return stem + ".parquet"
+
+
+def ensure_parquet(stem):
+    # Build the Parquet file on first use, reuse it afterwards
+    source_file = stem + ".parquet"
+    if not os.path.exists(source_file):
+        build_parquet(stem)
+    return source_file
+
+
+if __name__ == "__main__":
+    for stem in SCHEMAS:
+        build_parquet(stem)